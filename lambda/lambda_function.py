@@ -1,18 +1,31 @@
 import boto3
+import gzip
+import json
+from botocore.config import Config
+from botocore.exceptions import ClientError
 import os
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.mime.application import MIMEApplication
+from functools import lru_cache
+from operator import itemgetter
+from email import policy
+from email.message import EmailMessage
 
 # ============================================================================
 # LOGGER CONFIGURATION
 # ============================================================================
 
+# Set DEBUG=1 to enable verbose debug logging
+_DEBUG = os.environ.get('DEBUG', '0') == '1'
+
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+logger.setLevel(logging.DEBUG if _DEBUG else logging.INFO)
+
+# Keep AWS SDK wire logging out of debug output
+logging.getLogger('botocore').setLevel(logging.INFO)
+logging.getLogger('urllib3').setLevel(logging.INFO)
 
 formatter = logging.Formatter(
     '[%(levelname)s] %(asctime)s - %(message)s',
@@ -45,18 +58,120 @@ RECIPIENT_EMAILS = [email.strip() for email in RECIPIENT_EMAILS_RAW.split(',')]
 INTERVAL_MINUTES = int(os.environ.get('INTERVAL_MINUTES', '60'))
 AWS_REGION = os.environ.get('AWS_REGION', 'ap-southeast-1')
 
-# Initialize AWS clients
-logs_client = boto3.client('logs', region_name=AWS_REGION)
-ses_client = boto3.client('ses', region_name=AWS_REGION)
+# Timestamp format used in reports and emails
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# CloudWatch Logs Insights accepts at most 50 log groups per StartQuery call
+MAX_LOG_GROUPS_PER_QUERY = 50
+
+# Query polling - each query gets its own wall-clock budget
+QUERY_TIMEOUT_SECONDS = 60
+POLL_INITIAL_INTERVAL = 0.25
+POLL_MAX_INTERVAL = 4
+MAX_POLL_WORKERS = 10
+
+# Stay under the account-wide limit on concurrently running Insights queries
+MAX_CONCURRENT_QUERIES = 20
+
+# ============================================================================
+# AWS CLIENTS - Built once per container
+# ============================================================================
+
+# Keep connections alive across the many poll calls in one invocation
+CLIENT_CONFIG = Config(
+    region_name=AWS_REGION,
+    tcp_keepalive=True,
+    connect_timeout=3,
+    read_timeout=10,
+    retries={'mode': 'adaptive', 'max_attempts': 3}
+)
+
+@lru_cache(maxsize=1)
+def get_logs():
+    """
+    CloudWatch Logs client, cached for the container lifetime.
+    """
+    return boto3.client('logs', config=CLIENT_CONFIG)
+
+@lru_cache(maxsize=1)
+def get_ses():
+    """
+    SES client, cached for the container lifetime.
+    """
+    return boto3.client('ses', config=CLIENT_CONFIG)
+
+# Pre-warm during the INIT phase; a failure here is retried on first use
+try:
+    get_logs()
+    get_ses()
+except Exception as e:
+    logger.warning(f"[WARNING] AWS client pre-warm failed: {str(e)}")
+
+# ============================================================================
+# LOG GROUP DISCOVERY - Cached per container, refreshed periodically
+# ============================================================================
+
+# Re-check which log groups exist at most this often so new groups get picked up
+LOG_GROUP_REFRESH_SECONDS = 900
+
+def log_group_prefixes(log_groups):
+    """
+    Collapse log groups into one listing prefix per parent path.
+    """
+    by_parent = {}
+    for log_group in log_groups:
+        parent = log_group.rsplit('/', 1)[0] + '/' if '/' in log_group else ''
+        by_parent.setdefault(parent, []).append(log_group)
+    
+    return sorted({os.path.commonprefix(members) for members in by_parent.values()})
+
+def filter_existing_log_groups(log_groups):
+    """
+    Drop configured log groups that don't exist in the account.
+    """
+    existing = set()
+    paginator = get_logs().get_paginator('describe_log_groups')
+    
+    for prefix in log_group_prefixes(log_groups):
+        params = {'logGroupNamePrefix': prefix} if prefix else {}
+        for page in paginator.paginate(**params):
+            for group in page['logGroups']:
+                existing.add(group['logGroupName'])
+    
+    for log_group in log_groups:
+        if log_group not in existing:
+            logger.warning(f"  [WARNING] Log group not found, skipping: {log_group}")
+    
+    return [lg for lg in log_groups if lg in existing]
+
+@lru_cache(maxsize=1)
+def resolve_log_groups(refresh_window):
+    """
+    Configured log groups that exist, cached for one refresh window.
+    A failed lookup is not cached and is retried on the next call.
+    """
+    return tuple(filter_existing_log_groups(LOG_GROUPS))
+
+def get_existing_log_groups():
+    """
+    Configured log groups that exist, re-resolved every LOG_GROUP_REFRESH_SECONDS.
+    """
+    return resolve_log_groups(int(time.time() // LOG_GROUP_REFRESH_SECONDS))
+
+try:
+    get_existing_log_groups()
+except Exception as e:
+    logger.warning(f"[WARNING] Log group discovery failed, retrying on invocation: {str(e)}")
 
 # ============================================================================
 # QUERIES - Service-type specific
 # ============================================================================
 
+# Only the most recent errors per log group are shown in the report
+MAX_ERRORS_PER_LOG_GROUP = 50
+
 LAMBDA_QUERY = r"""
-fields @timestamp, @message, @requestId, @logStream
-| sort @timestamp desc
-| limit 10000
+fields @timestamp, @message, @requestId, @logStream, @log
 | filter @message like /ERROR/
   or @message like /Error/
   or @message like /Exception/
@@ -69,9 +184,7 @@ fields @timestamp, @message, @requestId, @logStream
 """
 
 ECS_QUERY = r"""
-fields @timestamp, @message, @logStream
-| sort @timestamp desc
-| limit 10000
+fields @timestamp, @message, @logStream, @log
 | filter @message like /An unexpected error/
   or @message like /unhandled exception/i
   or @message like /ERROR/
@@ -83,9 +196,7 @@ fields @timestamp, @message, @logStream
 """
 
 RDS_QUERY = r"""
-fields @timestamp, @message
-| sort @timestamp desc
-| limit 10000
+fields @timestamp, @message, @log
 | filter @message like /ERROR:/
   or @message like /FATAL:/
   or @message like /PANIC:/
@@ -97,37 +208,47 @@ fields @timestamp, @message
   or @message like /constraint violation/i
 """
 
-# Select query based on service type
-if SERVICE_TYPE == 'lambda':
-    QUERY = LAMBDA_QUERY
-elif SERVICE_TYPE == 'ecs':
-    QUERY = ECS_QUERY
-elif SERVICE_TYPE == 'rds':
-    QUERY = RDS_QUERY
-else:
-    QUERY = LAMBDA_QUERY  # Default
-
-# DEBUG: Log configuration
-logger.info("=" * 80)
-logger.info(f"{PROJECT_NAME.upper()} {SERVICE_NAME.upper()} ERROR MONITOR - CONFIGURATION")
-logger.info("=" * 80)
-logger.info(f"Project: {PROJECT_NAME}")
-logger.info(f"Environment: {ENVIRONMENT}")
-logger.info(f"Service Name: {SERVICE_NAME}")
-logger.info(f"Service Type: {SERVICE_TYPE}")
-logger.info(f"Log Groups ({len(LOG_GROUPS)}):")
-for idx, lg in enumerate(LOG_GROUPS, 1):
-    logger.info(f"  {idx}. {lg}")
-logger.info(f"Sender: {SENDER_EMAIL}")
-logger.info(f"DEBUG: Recipient Configuration:")
-logger.info(f"  Raw value: {RECIPIENT_EMAILS_RAW}")
-logger.info(f"  Parsed recipients: {RECIPIENT_EMAILS}")
-logger.info(f"  Number of recipients: {len(RECIPIENT_EMAILS)}")
-for idx, recipient in enumerate(RECIPIENT_EMAILS, 1):
-    logger.info(f"    Recipient #{idx}: {recipient}")
-logger.info(f"Scan Interval: {INTERVAL_MINUTES} minutes")
-logger.info(f"Region: {AWS_REGION}")
-logger.info("=" * 80)
+def build_query(base_query, limit):
+    """
+    Build the detail query returning the most recent `limit` errors.
+    """
+    return base_query + f"| sort @timestamp desc\n| limit {limit}\n"
+
+def build_count_query(base_query):
+    """
+    Build the query returning the true error count and first/last error time per log group.
+    """
+    return base_query + (
+        "| stats count(*) as errorCount, earliest(@timestamp) as firstError,"
+        " latest(@timestamp) as lastError by @log\n"
+    )
+
+# Select query based on service type - add new service types here
+QUERIES = {
+    'lambda': LAMBDA_QUERY,
+    'ecs': ECS_QUERY,
+    'rds': RDS_QUERY
+}
+BASE_QUERY = QUERIES.get(SERVICE_TYPE, LAMBDA_QUERY)  # Default: lambda
+
+QUERY = build_query(BASE_QUERY, MAX_ERRORS_PER_LOG_GROUP)
+COUNT_QUERY = build_count_query(BASE_QUERY)
+
+# Only the selected query is needed after import
+del QUERIES, LAMBDA_QUERY, ECS_QUERY, RDS_QUERY
+
+# Log configuration as a single record to keep INIT-phase logging cheap
+logger.info("Configuration: " + json.dumps({
+    'project': PROJECT_NAME,
+    'environment': ENVIRONMENT,
+    'service_name': SERVICE_NAME,
+    'service_type': SERVICE_TYPE,
+    'log_groups': LOG_GROUPS,
+    'sender': SENDER_EMAIL,
+    'recipients': RECIPIENT_EMAILS,
+    'interval_minutes': INTERVAL_MINUTES,
+    'region': AWS_REGION
+}))
 
 # ============================================================================
 # LAMBDA HANDLER
@@ -154,22 +275,43 @@ def lambda_handler(event, context):
     logger.info(f"  Duration: {INTERVAL_MINUTES} minutes\n")
     
     # Query all log groups
-    all_results = {}
-    total_errors = 0
-    
-    logger.info(f"Querying {len(LOG_GROUPS)} Log Groups:")
-    for log_group in LOG_GROUPS:
-        logger.info(f"  Processing: {log_group}")
-        results = query_logs(log_group, QUERY, start_epoch, end_epoch)
-        if results:
-            all_results[log_group] = results
-            total_errors += len(results)
-            logger.info(f"    ✓ Found {len(results)} errors")
-        else:
-            logger.info(f"    ✓ No errors found")
+    error_counts = {}
+    error_times = {}
+    
+    # A single missing log group fails the whole batch, so drop those first
+    try:
+        log_groups = list(get_existing_log_groups())
+        batch_size = MAX_LOG_GROUPS_PER_QUERY
+    except Exception as e:
+        # Without a listing a missing group can't be ruled out, so don't batch
+        logger.warning(f"  [WARNING] Could not list log groups, querying each separately: {str(e)}")
+        log_groups = LOG_GROUPS
+        batch_size = 1
+    
+    batches = [
+        log_groups[i:i + batch_size]
+        for i in range(0, len(log_groups), batch_size)
+    ]
+    
+    # Count errors per log group - the detail query below is limited, so counts and times come from here
+    logger.info(f"Querying {len(log_groups)} Log Groups in {len(batches)} batch(es):")
+    for batch, batch_results in run_queries(batches, COUNT_QUERY, start_epoch, end_epoch):
+        for log_group in batch:
+            logger.info(f"  {log_group}")
+            rows = batch_results.get(log_group)
+            row = {f['field']: f['value'] for f in rows[0]} if rows else {}
+            count = int(row.get('errorCount', 0))
+            if count:
+                error_counts[log_group] = count
+                error_times[log_group] = (row.get('firstError'), row.get('lastError'))
+                logger.info(f"    ✓ Found {count} errors")
+            else:
+                logger.info(f"    ✓ No errors found")
+    
+    total_errors = sum(error_counts.values())
     
     # Check if any errors were found
-    if not all_results:
+    if not error_counts:
         logger.info(f"\n[SUCCESS] NO ERRORS DETECTED in {PROJECT_NAME} {SERVICE_NAME}")
         logger.info("=" * 80 + "\n")
         
@@ -179,22 +321,39 @@ def lambda_handler(event, context):
         }
     
     # Errors detected - generate report and send alert
-    logger.info(f"\n[ALERT] ERRORS DETECTED: {total_errors} errors across {len(all_results)} log groups")
+    logger.info(f"\n[ALERT] ERRORS DETECTED: {total_errors} errors across {len(error_counts)} log groups")
     
     # Generate error summary
-    logger.info(f"DEBUG: Generating error summary...")
-    error_summary = generate_error_summary(all_results, total_errors)
-    logger.info(f"DEBUG: Error summary generated")
-    logger.info(f"  Total errors: {error_summary['total_errors']}")
-    logger.info(f"  Affected log groups: {error_summary['affected_log_groups']}")
+    logger.debug(f"Generating error summary...")
+    error_summary = generate_error_summary(error_counts, error_times)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Error summary generated")
+        logger.debug(f"  Total errors: {error_summary['total_errors']}")
+        logger.debug(f"  Affected log groups: {error_summary['affected_log_groups']}")
+    
+    # Fetch the most recent errors, one query per affected log group so each gets its own limit.
+    # Each group's section is formatted as soon as its query completes and the raw rows are dropped.
+    sections = {}
+    detail_batches = [[log_group] for log_group in error_counts]
+    
+    for batch, batch_results in run_queries(detail_batches, QUERY, start_epoch, end_epoch):
+        for log_group in batch:
+            sections[log_group] = bytearray()
+            write_group_section(sections[log_group], log_group, error_counts[log_group], batch_results.get(log_group, []))
+    
+    # Groups whose detail query could not be started still get their count
+    for log_group, count in error_counts.items():
+        if log_group not in sections:
+            sections[log_group] = bytearray()
+            write_group_section(sections[log_group], log_group, count, [])
     
     # Format report
-    logger.info(f"DEBUG: Formatting error report...")
-    log_content = format_error_report(all_results, start_time, end_time, error_summary)
-    logger.info(f"DEBUG: Error report formatted")
-    logger.info(f"  Report length: {len(log_content)} characters")
-    logger.info(f"  Report size: {len(log_content.encode('utf-8'))} bytes")
-    logger.info(f"  DEBUG: Attachment will be created: YES")
+    logger.debug(f"Formatting error report...")
+    log_content = format_error_report(sections, start_time, end_time, error_summary)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Error report formatted")
+        logger.debug(f"  Report size: {len(log_content)} bytes")
+        logger.debug(f"  Attachment will be created: YES")
     
     # Send email alert
     send_email_with_attachment(log_content, start_time, end_time, total_errors, error_summary)
@@ -211,157 +370,333 @@ def lambda_handler(event, context):
 # QUERY EXECUTION
 # ============================================================================
 
-def query_logs(log_group, query, start_epoch, end_epoch):
+def run_queries(batches, query, start_epoch, end_epoch):
+    """
+    Run one query per batch in waves that stay under the concurrent query limit,
+    yielding (batch, results) as each one finishes.
+    """
+    pending = list(batches)
+    
+    while pending:
+        wave, pending = pending[:MAX_CONCURRENT_QUERIES], pending[MAX_CONCURRENT_QUERIES:]
+        queries, retry = start_all(wave, query, start_epoch, end_epoch)
+        pending.extend(retry)
+        yield from poll_all(queries)
+
+def start_all(batches, query, start_epoch, end_epoch):
+    """
+    Start one CloudWatch Logs Insights query per batch of log groups.
+    Returns (batch, query_id) pairs for the queries that started, and the
+    batches to retry because a missing log group failed their whole batch.
+    """
+    queries = []
+    retry = []
+    
+    for batch in batches:
+        try:
+            response = get_logs().start_query(
+                logGroupNames=batch,
+                startTime=start_epoch,
+                endTime=end_epoch,
+                queryString=query
+            )
+            query_id = response['queryId']
+            logger.info(f"  Started query {query_id} for {len(batch)} log groups")
+            queries.append((batch, query_id))
+            
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ResourceNotFoundException':
+                logger.error(f"  [ERROR] Query error: {str(e)}", exc_info=True)
+            
+            # A missing log group fails the whole batch - the cached listing is stale,
+            # so re-resolve and retry the survivors, or fall back to one log group at a time
+            elif len(batch) > 1:
+                logger.warning(f"  [WARNING] Log group missing from batch of {len(batch)}, retrying: {str(e)}")
+                resolve_log_groups.cache_clear()
+                retry.extend(retry_batches(batch))
+            else:
+                logger.warning(f"  [WARNING] Log group not found, not monitored: {batch[0]}")
+            
+        except Exception as e:
+            logger.error(f"  [ERROR] Query error: {str(e)}", exc_info=True)
+    
+    return queries, retry
+
+def retry_batches(batch):
     """
-    Execute CloudWatch Logs Insights query.
+    Split a batch that failed on a missing log group into batches to retry.
+    Survivors of a fresh listing are retried together; if the listing fails or
+    finds nothing missing, each log group is retried on its own.
     """
     try:
-        # Start query
-        response = logs_client.start_query(
-            logGroupName=log_group,
-            startTime=start_epoch,
-            endTime=end_epoch,
-            queryString=query
-        )
-        
-        query_id = response['queryId']
-        logger.info(f"    Query ID: {query_id}")
+        survivors = filter_existing_log_groups(batch)
+    except Exception as e:
+        logger.warning(f"  [WARNING] Could not list log groups: {str(e)}")
+        survivors = batch
+    
+    if len(survivors) < len(batch):
+        return [survivors] if survivors else []
+    
+    return [[log_group] for log_group in batch]
+
+def poll_all(queries):
+    """
+    Wait for started queries, yielding (batch, results) as each one finishes.
+    Multiple queries share one DescribeQueries status check per round, and
+    results are only fetched once a query is no longer running.
+    """
+    if not queries:
+        return
+    
+    if len(queries) == 1:
+        batch, query_id = queries[0]
+        yield batch, poll_one(query_id)
+        return
+    
+    pending = {query_id: batch for batch, query_id in queries}
+    deadline = time.monotonic() + QUERY_TIMEOUT_SECONDS
+    attempt = 0
+    
+    with ThreadPoolExecutor(max_workers=min(MAX_POLL_WORKERS, len(queries))) as executor:
+        while True:
+            running = poll_statuses(pending)
+            futures = {
+                executor.submit(fetch_results, query_id): query_id
+                for query_id in pending if query_id not in running
+            }
+            
+            for future in as_completed(futures):
+                results = future.result()
+                if results is not None:
+                    yield pending.pop(futures[future]), results
+            
+            if not pending:
+                return
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            
+            time.sleep(min(poll_delay(attempt), remaining))
+            attempt += 1
+    
+    for query_id, batch in pending.items():
+        logger.error(f"    [ERROR] Query {query_id} timeout after {QUERY_TIMEOUT_SECONDS}s")
+        yield batch, {}
+
+def poll_one(query_id):
+    """
+    Wait for a single query with exponential backoff and return its results keyed by log group.
+    """
+    deadline = time.monotonic() + QUERY_TIMEOUT_SECONDS
+    attempt = 0
+    
+    while True:
+        results = fetch_results(query_id)
+        if results is not None:
+            return results
         
-        # Poll for results
-        max_wait = 60
-        interval = 2
-        elapsed = 0
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
         
-        while elapsed < max_wait:
-            result = logs_client.get_query_results(queryId=query_id)
-            status = result['status']
-            
-            if status == 'Complete':
-                results = result['results']
-                return results
+        time.sleep(min(poll_delay(attempt), remaining))
+        attempt += 1
+    
+    logger.error(f"    [ERROR] Query {query_id} timeout after {QUERY_TIMEOUT_SECONDS}s")
+    return {}
+
+def poll_statuses(query_ids):
+    """
+    Return which of query_ids are still running, using DescribeQueries instead of
+    one GetQueryResults call per query.
+    """
+    running = set()
+    params = {'status': 'Running', 'maxResults': 50}
+    
+    try:
+        while True:
+            response = get_logs().describe_queries(**params)
+            running.update(q['queryId'] for q in response.get('queries', []))
             
-            elif status in ['Failed', 'Cancelled']:
-                logger.error(f"    [ERROR] Query {status.lower()}")
-                return []
+            next_token = response.get('nextToken')
+            if not next_token:
+                break
+            params['nextToken'] = next_token
             
-            time.sleep(interval)
-            elapsed += interval
+    except Exception as e:
+        # Fall back to checking every query individually
+        logger.warning(f"    [WARNING] DescribeQueries failed: {str(e)}")
+        return set()
+    
+    return running & set(query_ids)
+
+def fetch_results(query_id):
+    """
+    Fetch a query's results keyed by log group, or None while it is still running.
+    """
+    try:
+        result = get_logs().get_query_results(queryId=query_id)
+        status = result['status']
+        
+        if status == 'Complete':
+            return partition_by_log_group(result['results'])
+        
+        elif status in ['Failed', 'Cancelled', 'Timeout']:
+            logger.error(f"    [ERROR] Query {query_id} {status.lower()}")
+            return {}
         
-        logger.error(f"    [ERROR] Query timeout after {max_wait}s")
-        return []
+        return None
+        
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ResourceNotFoundException':
+            logger.warning(f"    [WARNING] Query {query_id} not found: {str(e)}")
+        else:
+            logger.error(f"    [ERROR] Query {query_id} error: {str(e)}", exc_info=True)
+        return {}
         
     except Exception as e:
-        logger.error(f"    [ERROR] Query error: {str(e)}", exc_info=True)
-        return []
+        logger.error(f"    [ERROR] Query {query_id} error: {str(e)}", exc_info=True)
+        return {}
+
+def poll_delay(attempt):
+    """
+    Exponential backoff between polls, capped at POLL_MAX_INTERVAL.
+    """
+    return min(POLL_MAX_INTERVAL, POLL_INITIAL_INTERVAL * 2 ** attempt)
+
+def partition_by_log_group(results):
+    """
+    Bucket batched query results by their source log group.
+    """
+    grouped = {}
+    
+    for result in results:
+        # @log is reported as "accountId:logGroupName"
+        source = next((f['value'] for f in result if f['field'] == '@log'), '')
+        log_group = source.split(':', 1)[-1]
+        grouped.setdefault(log_group, []).append(result)
+    
+    return grouped
 
 # ============================================================================
 # ERROR ANALYSIS
 # ============================================================================
 
-def generate_error_summary(all_results, total_errors):
+def generate_error_summary(error_counts, error_times):
     """
     Analyze errors from multiple log groups and generate summary.
+    `error_times` maps each log group to its (first, last) error timestamp.
     """
-    summary = {
-        'total_errors': total_errors,
-        'affected_log_groups': len(all_results),
-        'log_group_breakdown': {},
-        'first_error_time': None,
-        'last_error_time': None
-    }
-    
-    # Collect breakdown per log group
-    for log_group, results in all_results.items():
-        summary['log_group_breakdown'][log_group] = len(results)
-        
-        # Track overall first and last error times
-        for result in results:
-            timestamp = next((f['value'] for f in result if f['field'] == '@timestamp'), None)
-            if timestamp:
-                if not summary['first_error_time']:
-                    summary['first_error_time'] = timestamp
-                summary['last_error_time'] = timestamp
+    first_times = [first for first, _ in error_times.values() if first]
+    last_times = [last for _, last in error_times.values() if last]
     
-    return summary
+    return {
+        'total_errors': sum(error_counts.values()),
+        'affected_log_groups': len(error_counts),
+        'log_group_breakdown': dict(error_counts),
+        'sorted_breakdown': sorted(error_counts.items(), key=itemgetter(1), reverse=True),
+        'first_error_time': min(first_times) if first_times else None,
+        'last_error_time': max(last_times) if last_times else None
+    }
 
 # ============================================================================
 # REPORT FORMATTING
 # ============================================================================
 
-def format_error_report(all_results, start_time, end_time, summary):
+def format_error_report(sections, start_time, end_time, summary):
     """
     Format error log report with summary for multiple log groups.
+    `sections` maps each log group to its section from write_group_section;
+    they are emitted in the same order as the breakdown.
+    Returns the report as UTF-8 bytes, ready to attach.
     """
-    lines = []
+    buf = bytearray()
+    
+    def write(text):
+        buf.extend(text.encode('utf-8', errors='replace'))
     
     # Header with Environment
-    lines.append("=" * 80 + "\n")
-    lines.append(f"{PROJECT_NAME.upper()} - {SERVICE_NAME.upper()} ERROR REPORT [{ENVIRONMENT}]\n")
-    lines.append("=" * 80 + "\n\n")
+    write("=" * 80 + "\n")
+    write(f"{PROJECT_NAME.upper()} - {SERVICE_NAME.upper()} ERROR REPORT [{ENVIRONMENT}]\n")
+    write("=" * 80 + "\n\n")
     
     # Time Range
-    lines.append("MONITORING PERIOD\n")
-    lines.append("-" * 80 + "\n")
-    lines.append(f"Start Time:  {start_time.strftime('%Y-%m-%d %H:%M:%S')} UTC\n")
-    lines.append(f"End Time:    {end_time.strftime('%Y-%m-%d %H:%M:%S')} UTC\n")
-    lines.append(f"Duration:    {INTERVAL_MINUTES} minutes\n\n")
+    write("MONITORING PERIOD\n")
+    write("-" * 80 + "\n")
+    write(f"Start Time:  {start_time.strftime(TIME_FORMAT)} UTC\n")
+    write(f"End Time:    {end_time.strftime(TIME_FORMAT)} UTC\n")
+    write(f"Duration:    {INTERVAL_MINUTES} minutes\n\n")
     
     # Summary Statistics
-    lines.append("ERROR SUMMARY\n")
-    lines.append("-" * 80 + "\n")
-    lines.append(f"Total Errors Found:     {summary['total_errors']}\n")
-    lines.append(f"Project:                {PROJECT_NAME}\n")
-    lines.append(f"Environment:            {ENVIRONMENT}\n")
-    lines.append(f"Service:                {SERVICE_NAME}\n")
-    lines.append(f"Affected Log Groups:    {summary['affected_log_groups']}\n")
-    lines.append(f"First Error Occurred:   {summary['first_error_time']}\n")
-    lines.append(f"Last Error Occurred:    {summary['last_error_time']}\n\n")
+    write("ERROR SUMMARY\n")
+    write("-" * 80 + "\n")
+    write(f"Total Errors Found:     {summary['total_errors']}\n")
+    write(f"Project:                {PROJECT_NAME}\n")
+    write(f"Environment:            {ENVIRONMENT}\n")
+    write(f"Service:                {SERVICE_NAME}\n")
+    write(f"Affected Log Groups:    {summary['affected_log_groups']}\n")
+    write(f"First Error Occurred:   {summary['first_error_time']}\n")
+    write(f"Last Error Occurred:    {summary['last_error_time']}\n\n")
     
     # Log Group Breakdown
     if summary['log_group_breakdown']:
-        lines.append("ERROR BREAKDOWN BY LOG GROUP\n")
-        lines.append("-" * 80 + "\n")
-        for log_group, count in sorted(summary['log_group_breakdown'].items(), key=lambda x: x[1], reverse=True):
+        write("ERROR BREAKDOWN BY LOG GROUP\n")
+        write("-" * 80 + "\n")
+        for log_group, count in summary['sorted_breakdown']:
             percentage = (count / summary['total_errors']) * 100
-            lines.append(f"  {log_group}\n")
-            lines.append(f"    {count:>4} errors ({percentage:>5.1f}%)\n\n")
+            write(f"  {log_group}\n")
+            write(f"    {count:>4} errors ({percentage:>5.1f}%)\n\n")
     
-    lines.append("=" * 80 + "\n\n")
+    write("=" * 80 + "\n\n")
     
     # Detailed Error Logs - grouped by log group
-    lines.append("DETAILED ERROR LOGS\n")
-    lines.append("=" * 80 + "\n\n")
-    
-    for log_group, results in all_results.items():
-        lines.append(f"\n{'#' * 80}\n")
-        lines.append(f"LOG GROUP: {log_group}\n")
-        lines.append(f"Error Count: {len(results)}\n")
-        lines.append(f"{'#' * 80}\n\n")
-        
-        # Show first 50 errors per log group
-        for i, result in enumerate(results[:50], 1):
-            timestamp = next((f['value'] for f in result if f['field'] == '@timestamp'), 'N/A')
-            message = next((f['value'] for f in result if f['field'] == '@message'), 'N/A')
-            stream = next((f['value'] for f in result if f['field'] == '@logStream'), 'N/A')
-            
-            lines.append(f"ERROR #{i}\n")
-            lines.append(f"Timestamp:   {timestamp}\n")
-            lines.append(f"Log Stream:  {stream}\n")
-            lines.append(f"Message:     {message}\n")
-            lines.append("-" * 80 + "\n\n")
-        
-        # Truncation notice
-        if len(results) > 50:
-            lines.append(f"... and {len(results) - 50} more errors (truncated for readability)\n\n")
+    write("DETAILED ERROR LOGS\n")
+    write("=" * 80 + "\n\n")
+    
+    for log_group, _ in summary['sorted_breakdown']:
+        buf.extend(sections[log_group])
     
     # Footer
-    lines.append("=" * 80 + "\n")
-    lines.append("Full details available in CloudWatch Logs Insights\n")
-    lines.append("=" * 80 + "\n")
-    lines.append("END OF REPORT\n")
-    lines.append("=" * 80 + "\n")
+    write("=" * 80 + "\n")
+    write("Full details available in CloudWatch Logs Insights\n")
+    write("=" * 80 + "\n")
+    write("END OF REPORT\n")
+    write("=" * 80 + "\n")
+    
+    return bytes(buf)
+
+def write_group_section(buf, log_group, count, results):
+    """
+    Append one log group's detailed error section to the report buffer.
+    """
+    def write(text):
+        buf.extend(text.encode('utf-8', errors='replace'))
+    
+    write(f"\n{'#' * 80}\n")
+    write(f"LOG GROUP: {log_group}\n")
+    write(f"Error Count: {count}\n")
+    write(f"{'#' * 80}\n\n")
+    
+    # Show the most recent errors per log group
+    for i, result in enumerate(results[:MAX_ERRORS_PER_LOG_GROUP], 1):
+        row = {f['field']: f['value'] for f in result}
+        timestamp = row.get('@timestamp', 'N/A')
+        message = row.get('@message', 'N/A')
+        stream = row.get('@logStream', 'N/A')
+        
+        write(
+            f"ERROR #{i}\n"
+            f"Timestamp:   {timestamp}\n"
+            f"Log Stream:  {stream}\n"
+            f"Message:     {message}\n"
+            + "-" * 80 + "\n\n"
+        )
     
-    return ''.join(lines)
+    # Truncation notice
+    shown = min(len(results), MAX_ERRORS_PER_LOG_GROUP)
+    if count > shown:
+        write(f"... and {count - shown} more errors (truncated for readability)\n\n")
 
 # ============================================================================
 # EMAIL DELIVERY
@@ -371,9 +706,13 @@ def send_email_with_attachment(log_content, start_time, end_time, error_count, s
     """
     Send email alert with error report attachment.
     """
+    start_fmt = start_time.strftime(TIME_FORMAT)
+    end_fmt = end_time.strftime(TIME_FORMAT)
+    content_size = len(log_content)
+    
     try:
         logger.info("=" * 80)
-        logger.info("DEBUG: Starting email send process")
+        logger.debug("Starting email send process")
         
         # Email subject
         subject = f"[{ENVIRONMENT}] ALERT: {SERVICE_NAME} Errors"
@@ -385,7 +724,7 @@ def send_email_with_attachment(log_content, start_time, end_time, error_count, s
 ================================================================================
 
 MONITORING PERIOD
-  Time Range: {start_time.strftime('%Y-%m-%d %H:%M:%S')} to {end_time.strftime('%Y-%m-%d %H:%M:%S')} UTC
+  Time Range: {start_fmt} to {end_fmt} UTC
   Duration: {INTERVAL_MINUTES} minutes
 
 ALERT SUMMARY
@@ -399,7 +738,7 @@ LOG GROUP BREAKDOWN
 """
         
         # Add log group breakdown to email body
-        for log_group, count in sorted(summary['log_group_breakdown'].items(), key=lambda x: x[1], reverse=True):
+        for log_group, count in summary['sorted_breakdown']:
             body_text += f"  - {log_group}: {count} errors\n"
         
         body_text += f"""
@@ -423,63 +762,70 @@ Environment: {ENVIRONMENT}
 Region: {AWS_REGION}
 """
         
-        logger.info(f"  Email body length: {len(body_text)} characters")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"  Email body length: {len(body_text)} characters")
         
         # Create email
-        msg = MIMEMultipart()
+        msg = EmailMessage()
         msg['Subject'] = subject
         msg['From'] = SENDER_EMAIL
         msg['To'] = ', '.join(RECIPIENT_EMAILS)
         
         # DEBUG: Log recipient details
-        logger.info(f"DEBUG: Email headers configured")
-        logger.info(f"  From: {SENDER_EMAIL}")
-        logger.info(f"  To (header): {', '.join(RECIPIENT_EMAILS)}")
-        logger.info(f"  Number of recipients: {len(RECIPIENT_EMAILS)}")
-        for idx, recipient in enumerate(RECIPIENT_EMAILS, 1):
-            logger.info(f"    Recipient #{idx}: {recipient}")
-        
-        # Attach body
-        msg.attach(MIMEText(body_text, 'plain'))
-        logger.info(f"  Email body attached successfully")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Email headers configured")
+            logger.debug(f"  From: {SENDER_EMAIL}")
+            logger.debug(f"  To (header): {', '.join(RECIPIENT_EMAILS)}")
+            logger.debug(f"  Number of recipients: {len(RECIPIENT_EMAILS)}")
+            for idx, recipient in enumerate(RECIPIENT_EMAILS, 1):
+                logger.debug(f"    Recipient #{idx}: {recipient}")
+        
+        # Attach body - plain text needs no quoted-printable/base64 transfer encoding
+        msg.set_content(body_text, cte='7bit' if body_text.isascii() else '8bit')
+        logger.debug(f"  Email body attached successfully")
         
         # Attach error report
-        filename = f"{PROJECT_NAME.lower()}_{SERVICE_TYPE}_errors_{ENVIRONMENT.lower()}_{start_time.strftime('%Y%m%d_%H%M')}.txt"
+        filename = f"{PROJECT_NAME.lower()}_{SERVICE_TYPE}_errors_{ENVIRONMENT.lower()}_{start_time.strftime('%Y%m%d_%H%M')}.txt.gz"
+        
+        # Compress the report - repetitive text shrinks well and keeps the raw message small
+        compressed = gzip.compress(log_content, compresslevel=6)
         
         # DEBUG: Log attachment details
-        logger.info(f"DEBUG: Creating attachment (TXT file)")
-        logger.info(f"  Filename: {filename}")
-        logger.info(f"  Content length: {len(log_content)} characters")
-        logger.info(f"  Content size: {len(log_content.encode('utf-8', errors='replace'))} bytes")
-        logger.info(f"  Attachment created: YES")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Creating attachment (gzipped TXT file)")
+            logger.debug(f"  Filename: {filename}")
+            logger.debug(f"  Content size: {content_size} bytes")
+            logger.debug(f"  Compressed size: {len(compressed)} bytes")
+            logger.debug(f"  Attachment created: YES")
         
-        attachment = MIMEApplication(log_content.encode('utf-8', errors='replace'))
-        attachment.add_header('Content-Disposition', 'attachment', filename=filename)
-        msg.attach(attachment)
+        msg.add_attachment(compressed, maintype='application', subtype='gzip', filename=filename)
         
-        logger.info(f"  Attachment added to email successfully")
-        logger.info(f"  Total MIME parts: {len(msg.get_payload())} (1=body, 2=body+attachment)")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"  Attachment added to email successfully")
+            logger.debug(f"  Total MIME parts: {len(msg.get_payload())} (1=body, 2=body+attachment)")
         
         # DEBUG: Log final recipient list before SES call
-        logger.info(f"DEBUG: Preparing to send email via SES")
-        logger.info(f"  Destinations for SES API: {RECIPIENT_EMAILS}")
-        logger.info(f"  Destination type: {type(RECIPIENT_EMAILS)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Preparing to send email via SES")
+            logger.debug(f"  Destinations for SES API: {RECIPIENT_EMAILS}")
+            logger.debug(f"  Destination type: {type(RECIPIENT_EMAILS)}")
         
         # Send via SES
-        logger.info(f"DEBUG: Calling SES send_raw_email API...")
-        response = ses_client.send_raw_email(
+        logger.debug(f"Calling SES send_raw_email API...")
+        response = get_ses().send_raw_email(
             Source=SENDER_EMAIL,
             Destinations=RECIPIENT_EMAILS,
-            RawMessage={'Data': msg.as_string()}
+            RawMessage={'Data': msg.as_bytes(policy=policy.SMTP)}
         )
         
         # DEBUG: Log SES response
-        logger.info(f"DEBUG: SES Response received")
-        logger.info(f"  Full response: {response}")
-        logger.info(f"  MessageId: {response.get('MessageId', 'N/A')}")
-        logger.info(f"  HTTP Status Code: {response.get('ResponseMetadata', {}).get('HTTPStatusCode', 'N/A')}")
-        logger.info(f"  Request ID: {response.get('ResponseMetadata', {}).get('RequestId', 'N/A')}")
-        logger.info(f"  Retry Attempts: {response.get('ResponseMetadata', {}).get('RetryAttempts', 0)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"SES Response received")
+            logger.debug(f"  Full response: {response}")
+            logger.debug(f"  MessageId: {response.get('MessageId', 'N/A')}")
+            logger.debug(f"  HTTP Status Code: {response.get('ResponseMetadata', {}).get('HTTPStatusCode', 'N/A')}")
+            logger.debug(f"  Request ID: {response.get('ResponseMetadata', {}).get('RequestId', 'N/A')}")
+            logger.debug(f"  Retry Attempts: {response.get('ResponseMetadata', {}).get('RetryAttempts', 0)}")
         
         # Success log
         logger.info(f"[SUCCESS] Email Sent Successfully")
@@ -495,22 +841,25 @@ Region: {AWS_REGION}
         logger.error(f"  Error message: {str(e)}")
         logger.error(f"  Full traceback:", exc_info=True)
         logger.info("  Attempting fallback email...")
-        send_simple_email(log_content[:2000], start_time, end_time, error_count)
+        send_simple_email(log_content[:2000].decode('utf-8', errors='replace'), start_time, end_time, error_count)
 
 def send_simple_email(log_content, start_time, end_time, error_count):
     """
     Fallback: Send simple email without attachment.
     """
+    start_fmt = start_time.strftime(TIME_FORMAT)
+    end_fmt = end_time.strftime(TIME_FORMAT)
+    
     try:
         logger.info("=" * 80)
-        logger.info("DEBUG: Starting fallback email (no attachment)")
+        logger.debug("Starting fallback email (no attachment)")
         
         # Email subject
         subject = f"[{ENVIRONMENT}] ALERT: {SERVICE_NAME} Errors"
         
         body = f"""{PROJECT_NAME} {SERVICE_NAME} Error Alert - {ENVIRONMENT}
 
-Time Range: {start_time.strftime('%Y-%m-%d %H:%M:%S')} to {end_time.strftime('%Y-%m-%d %H:%M:%S')} UTC
+Time Range: {start_fmt} to {end_fmt} UTC
 Total Errors Found: {error_count}
 Project: {PROJECT_NAME}
 Environment: {ENVIRONMENT}
@@ -527,11 +876,12 @@ Environment: {ENVIRONMENT}
 """
         
         # DEBUG: Log fallback email details
-        logger.info(f"  Recipients: {RECIPIENT_EMAILS}")
-        logger.info(f"  Number of recipients: {len(RECIPIENT_EMAILS)}")
-        logger.info(f"  Attachment: NONE (fallback mode)")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"  Recipients: {RECIPIENT_EMAILS}")
+            logger.debug(f"  Number of recipients: {len(RECIPIENT_EMAILS)}")
+            logger.debug(f"  Attachment: NONE (fallback mode)")
         
-        response = ses_client.send_email(
+        response = get_ses().send_email(
             Source=SENDER_EMAIL,
             Destination={'ToAddresses': RECIPIENT_EMAILS},
             Message={
@@ -541,9 +891,10 @@ Environment: {ENVIRONMENT}
         )
         
         # DEBUG: Log fallback response
-        logger.info(f"DEBUG: Fallback email SES response")
-        logger.info(f"  MessageId: {response.get('MessageId', 'N/A')}")
-        logger.info(f"  HTTP Status: {response.get('ResponseMetadata', {}).get('HTTPStatusCode', 'N/A')}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Fallback email SES response")
+            logger.debug(f"  MessageId: {response.get('MessageId', 'N/A')}")
+            logger.debug(f"  HTTP Status: {response.get('ResponseMetadata', {}).get('HTTPStatusCode', 'N/A')}")
         logger.info(f"[SUCCESS] Fallback email sent: {response['MessageId']}")
         logger.info("=" * 80)
         